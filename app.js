@@ -31,7 +31,49 @@
     applyTranslations('pt');
   }
 
+  function currentMode(){
+    return document.getElementById('mode').value;
+  }
+
+  function onModeChange(){
+    const mode = currentMode();
+    const expr = document.getElementById('expr');
+    document.getElementById('exprY').style.display = mode === 'parametric' ? 'block' : 'none';
+    document.getElementById('tRange').style.display = mode === 'parametric' ? 'block' : 'none';
+    expr.value = {explicit: 'sin(x)', implicit: 'x^2 + y^2 = 9', parametric: 'cos(t)'}[mode];
+    expr.placeholder = {explicit: 'f(x)', implicit: 'F(x, y)', parametric: 'x(t)'}[mode];
+  }
+
+  function plotLayout(){
+    return {autosize:true, margin:{l:40,r:20,t:20,b:40}, xaxis:{title:'x'}, yaxis:{title:'y'}, dragmode:'pan'};
+  }
+
+  // implicit/parametric curves are evaluated (vectorized) on the server
+  async function plotCurve(mode){
+    const expr = document.getElementById('expr').value.trim();
+    const xmin = parseFloat(document.getElementById('xmin').value)|| -10;
+    const xmax = parseFloat(document.getElementById('xmax').value)|| 10;
+    const samples = parseInt(document.getElementById('samples').value) || 400;
+    const body = mode === 'implicit'
+      ? {kind: 'implicit', expr: expr, xmin: xmin, xmax: xmax, ymin: xmin, ymax: xmax}
+      : {kind: 'parametric', xexpr: expr, yexpr: document.getElementById('exprY').value.trim(),
+         tmin: parseFloat(document.getElementById('tmin').value) || 0,
+         tmax: parseFloat(document.getElementById('tmax').value) || 2*Math.PI, samples: samples};
+    try{
+      const res = await axios.post('/api/curve', body);
+      const data = [{ x: res.data.x, y: res.data.y, mode: 'lines', line: {width:2}, connectgaps: false }];
+      const layout = plotLayout();
+      layout.yaxis.scaleanchor = 'x';
+      Plotly.newPlot('plot', data, layout, { responsive:true, scrollZoom:true });
+    }catch(e){
+      console.error(e);
+      alert('Invalid expression');
+    }
+  }
+
   function plotExpression(){
+    const mode = currentMode();
+    if(mode !== 'explicit') return plotCurve(mode);
     const expr = document.getElementById('expr').value.trim();
     const xmin = parseFloat(document.getElementById('xmin').value)|| -10;
     const xmax = parseFloat(document.getElementById('xmax').value)|| 10;
@@ -51,13 +93,15 @@
       }
     }
     const data = [{ x: xs, y: ys, mode: 'lines', line: {width:2} }];
-    const layout = {autosize:true, margin:{l:40,r:20,t:20,b:40}, xaxis:{title:'x'}, yaxis:{title:'y'}, dragmode:'pan'};
+    const layout = plotLayout();
     const config = { responsive:true, scrollZoom:true }; // scrollZoom enables unlimited zoom with mouse wheel
     Plotly.newPlot('plot', data, layout, config);
   }
 
   async function savePlot(){
-    const expr = document.getElementById('expr').value.trim();
+    let expr = document.getElementById('expr').value.trim();
+    if(expr && currentMode() === 'implicit' && !expr.includes('=')) expr = `${expr} = 0`;
+    if(expr && currentMode() === 'parametric') expr = `(${expr}, ${document.getElementById('exprY').value.trim()})`;
     if(!expr) return alert('Expression required');
     // export plot as png dataurl
     try{
@@ -78,6 +122,7 @@
   async function loadSaved(){
     try{
       const res = await fetch('/api/list');
+      if(!res.ok) return; // keep the current list if the server could not load it
       const list = await res.json();
       const ul = document.getElementById('savedList');
       ul.innerHTML = '';
@@ -176,6 +221,7 @@
     await loadTranslations();
     setupLangSelect();
     document.getElementById('btnPlot').addEventListener('click', plotExpression);
+    document.getElementById('mode').addEventListener('change', onModeChange);
     document.getElementById('btnSave').addEventListener('click', savePlot);
     document.getElementById('btnLogin').addEventListener('click', doLogin);
     document.getElementById('btnRegister').addEventListener('click', doRegister);
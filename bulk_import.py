@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Importação em lote de cálculos a partir de NDJSON.
+
+Cada linha é um objeto JSON:
+
+    {"expr": "sin(x)", "syntax": "mathjs", "result": "...",
+     "image": "data:image/png;base64,...",
+     "geometry": {"points": [{"x": 0, "y": 0, "name": "P1"}, ...],
+                  "lines": [{"p1": 0, "p2": 1}, ...],
+                  "circles": [{"center": 0, "radius": 2.5}, ...]}}
+
+Só `expr` é obrigatório. `syntax` indica de onde veio a expressão: "mathjs"
+(padrão, salva pela página web; só verificação leve, pois quem avalia é o
+math.js) ou "python" (salva pelo app Tk; validada com `curves.compile_expr`).
+
+As linhas são validadas num pool de processos (start method "spawn") e as
+válidas inseridas em lotes (`criar_geodb.insert_calculations`). O progresso é
+reportado por item, também em NDJSON; itens inválidos não impedem os demais.
+"""
+import base64
+import json
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+import criar_geodb as geodb
+from curves import compile_expr
+
+IMPORT_CONFIG = {
+    'workers': int(os.environ.get('GEOGEBRA_IMPORT_WORKERS', os.cpu_count() or 2)),
+    'batch_size': int(os.environ.get('GEOGEBRA_IMPORT_BATCH', '1000')),
+}
+
+# caracteres aceitos em expressões math.js (verificação leve)
+_MATHJS_CHARS = re.compile(r"[A-Za-z0-9_\s.,+\-*/^()\[\]%!=<>;:'?&|]*")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool de validação; "spawn" porque fork a partir do servidor com threads não é seguro."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=IMPORT_CONFIG['workers'],
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def reset_pool(failed):
+    """Descarta `failed` (ex.: após BrokenProcessPool) se ainda for o pool atual.
+
+    Outra requisição pode já ter trocado o pool; nesse caso o novo é mantido.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not failed:
+            return
+        _pool = None
+    failed.shutdown(wait=False, cancel_futures=True)
+
+
+def _reject_constant(name):
+    raise ValueError(f"número não finito: {name}")
+
+
+def _check_text(value, field):
+    """Levanta ValueError se houver NUL em alguma string de `value` (Postgres rejeita)."""
+    if isinstance(value, str):
+        if '\x00' in value:
+            raise ValueError(f"caractere NUL em {field}")
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _check_text(k, field)
+            _check_text(v, field)
+    elif isinstance(value, list):
+        for v in value:
+            _check_text(v, field)
+    elif isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"número não finito em {field}")
+
+
+def _check_mathjs(expr):
+    if not _MATHJS_CHARS.fullmatch(expr):
+        raise ValueError("caractere não permitido")
+    depth = 0
+    for ch in expr:
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+            if depth < 0:
+                break
+    if depth != 0:
+        raise ValueError("parênteses desbalanceados")
+
+
+def _validate_geometry(geo):
+    if not isinstance(geo, dict):
+        raise ValueError("geometry deve ser um objeto")
+    points = geo.get('points', [])
+    lines = geo.get('lines', [])
+    circles = geo.get('circles', [])
+    if not all(isinstance(v, list) for v in (points, lines, circles)):
+        raise ValueError("points/lines/circles devem ser listas")
+    for p in points:
+        try:
+            ok = all(isinstance(p[k], (int, float)) and math.isfinite(p[k]) for k in ('x', 'y'))
+        except OverflowError:
+            # inteiro grande demais para float
+            ok = False
+        if not ok:
+            raise ValueError("ponto com coordenadas inválidas")
+    n = len(points)
+
+    def ref(i):
+        return isinstance(i, int) and 0 <= i < n
+
+    for l in lines:
+        if not (ref(l['p1']) and ref(l['p2'])) or l['p1'] == l['p2']:
+            raise ValueError("reta com pontos inválidos")
+    for c in circles:
+        try:
+            radius = float(c['radius'])
+        except OverflowError:
+            radius = math.inf
+        if not ref(c['center']) or not (0 < radius < math.inf):
+            raise ValueError("círculo inválido")
+    return json.dumps({'points': points, 'lines': lines, 'circles': circles})
+
+
+def parse_item(line):
+    """Valida uma linha NDJSON.
+
+    Retorna (True, (expr, result, image_bytes, geometry_json)) ou (False, erro).
+    Roda nos processos do pool; nenhuma exceção escapa, para que uma linha ruim
+    não derrube o lote inteiro.
+    """
+    try:
+        return _parse_item(line)
+    except Exception as e:
+        return False, f"linha inválida: {e!r}"
+
+
+def _parse_item(line):
+    try:
+        # NaN/Infinity não são JSON válido para o Postgres (JSONB)
+        item = json.loads(line, parse_constant=_reject_constant)
+    except (ValueError, RecursionError) as e:
+        return False, f"JSON inválido: {e}"
+    if not isinstance(item, dict):
+        return False, "cada linha deve ser um objeto JSON"
+    expr = item.get('expr')
+    if not isinstance(expr, str) or not expr.strip():
+        return False, "expr required"
+    try:
+        _check_text(item, 'item')
+    except ValueError as e:
+        return False, str(e)
+    syntax = item.get('syntax', 'mathjs')
+    try:
+        if syntax == 'python':
+            # expressões salvas pelo Tk juntam várias curvas com ';'
+            for part in expr.split(';'):
+                compile_expr(part, ('x', 'y', 't'))
+        elif syntax == 'mathjs':
+            _check_mathjs(expr)
+        else:
+            return False, "syntax must be mathjs or python"
+    except ValueError as e:
+        return False, f"expressão inválida: {e}"
+    result = item.get('result')
+    if result is not None and not isinstance(result, str):
+        result = json.dumps(result)
+    img_bytes = None
+    image_data = item.get('image')
+    if image_data:
+        if not isinstance(image_data, str) or not image_data.startswith('data:image'):
+            return False, "invalid image data"
+        try:
+            header, b64 = image_data.split(',', 1)
+            img_bytes = base64.b64decode(b64, validate=True)
+        except Exception as e:
+            return False, f"invalid image data: {e}"
+    geometry = None
+    if item.get('geometry') is not None:
+        try:
+            geometry = _validate_geometry(item['geometry'])
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            return False, f"geometria inválida: {e}"
+    return True, (expr, result, img_bytes, geometry)
+
+
+def _validate_chunk(chunk_lines):
+    """Valida as linhas no pool; recria o pool se ele quebrar (uma nova tentativa)."""
+    chunksize = max(len(chunk_lines) // (4 * IMPORT_CONFIG['workers']), 1)
+    for _ in range(2):
+        pool = get_pool()
+        try:
+            return list(pool.map(parse_item, chunk_lines, chunksize=chunksize))
+        except (BrokenProcessPool, CancelledError) as e:
+            # CancelledError: outra requisição descartou este pool no meio do map
+            print(f"[bulk_import] pool de validação quebrou, recriando: {e!r}")
+            reset_pool(pool)
+    # pool indisponível: valida no próprio processo
+    return [parse_item(l) for l in chunk_lines]
+
+
+def _insert(conn, valid, user_id, page_size):
+    """Insere `valid` [(n, campos)]; se o lote falhar, divide ao meio até isolar as linhas ruins.
+
+    Gera (n, id) para linhas inseridas e (n, None) para as que falharam.
+    """
+    rows = [(expr, result, img, user_id, geometry) for _, (expr, result, img, geometry) in valid]
+    ids = geodb.insert_calculations(conn, rows, page_size=page_size)
+    if ids is not None:
+        for (n, _), calc_id in zip(valid, ids):
+            yield n, calc_id
+    elif len(valid) == 1:
+        yield valid[0][0], None
+    else:
+        mid = len(valid) // 2
+        yield from _insert(conn, valid[:mid], user_id, page_size)
+        yield from _insert(conn, valid[mid:], user_id, page_size)
+
+
+def import_ndjson(lines, user_id=None):
+    """Importa as linhas NDJSON de `lines`, gerando um dict de progresso por item.
+
+    Cada item gera {'line': n, 'ok': True, 'id': id} ou {'line': n, 'ok': False,
+    'error': ...}; ao final vem {'done': True, 'imported': .., 'failed': ..}.
+    Linhas em branco são ignoradas.
+    """
+    batch_size = IMPORT_CONFIG['batch_size']
+    numbered = ((n, l) for n, l in enumerate(lines, 1) if l.strip())
+    imported = failed = 0
+    conn = None
+    try:
+        while True:
+            chunk = list(islice(numbered, batch_size))
+            if not chunk:
+                break
+            results = _validate_chunk([l for _, l in chunk])
+            valid = []
+            for (n, _), (ok, value) in zip(chunk, results):
+                if ok:
+                    valid.append((n, value))
+                else:
+                    failed += 1
+                    yield {'line': n, 'ok': False, 'error': value}
+            if not valid:
+                continue
+            if conn is None:
+                conn = geodb.get_pg_connection()
+            if conn is None:
+                failed += len(valid)
+                for n, _ in valid:
+                    yield {'line': n, 'ok': False, 'error': 'db connection failed'}
+                continue
+            for n, calc_id in _insert(conn, valid, user_id, batch_size):
+                if calc_id is None:
+                    failed += 1
+                    yield {'line': n, 'ok': False, 'error': 'db insert failed'}
+                else:
+                    imported += 1
+                    yield {'line': n, 'ok': True, 'id': calc_id}
+    finally:
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    yield {'done': True, 'imported': imported, 'failed': failed}
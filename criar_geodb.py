@@ -8,6 +8,7 @@ Config por variáveis de ambiente ou valores padrão locais.
 import os
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 
 DB_CONFIG = {
     'dbname': os.environ.get('GEOGEBRA_DB', 'geogebra'),
@@ -45,6 +46,8 @@ def init_db():
         );
         """
     )
+    # geometria da cena (JSON), adicionada depois da criação original da tabela
+    cur.execute("ALTER TABLE calculations ADD COLUMN IF NOT EXISTS geometry JSONB")
     # users table
     cur.execute(
         """
@@ -89,6 +92,35 @@ def save_calculation(expr: str, result: str = None, image_bytes: bytes = None, u
             pass
 
 
+def insert_calculations(conn, rows, page_size=1000):
+    """Insere vários cálculos numa única transação usando `execute_values`.
+
+    `rows` é uma lista de tuplas (expr, result, image_bytes, user_id, geometry_json).
+    Usa a conexão do chamador (que a fecha). Retorna a lista de ids inseridos,
+    na mesma ordem, ou None em caso de erro (a transação é desfeita).
+    """
+    try:
+        with conn.cursor() as cur:
+            ids = execute_values(
+                cur,
+                "INSERT INTO calculations (expr, result, image, user_id, geometry) VALUES %s RETURNING id",
+                [(expr, result, psycopg2.Binary(img) if img is not None else None, user_id, geometry)
+                 for expr, result, img, user_id, geometry in rows],
+                template="(%s, %s, %s, %s, %s::jsonb)",
+                page_size=page_size,
+                fetch=True,
+            )
+        conn.commit()
+        return [r[0] for r in ids]
+    except Exception as e:
+        print(f"[geodb] erro ao inserir lote: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return None
+
+
 def list_calculations(limit=50):
     conn = get_pg_connection()
     if conn is None:
@@ -108,6 +140,29 @@ def list_calculations(limit=50):
             pass
 
 
+def list_calculations_by_user(user_id: int, limit=200):
+    """Lista os cálculos de um usuário (mais recentes primeiro).
+
+    Retorna None se a consulta falhar (distinto de uma lista vazia).
+    """
+    conn = get_pg_connection()
+    if conn is None:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, expr, result, created_at, octet_length(image), user_id FROM calculations WHERE user_id = %s ORDER BY created_at DESC LIMIT %s", (user_id, limit))
+            rows = cur.fetchall()
+        return rows
+    except Exception as e:
+        print(f"[geodb] erro ao listar: {e}")
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 def create_user(username: str, password_hash: str) -> bool:
     conn = get_pg_connection()
     if conn is None:
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Avaliação vetorizada de curvas implícitas e paramétricas.
+
+- Curvas implícitas `F(x, y) = 0`: F é avaliada numa grade 2D numa única
+  chamada NumPy; células com troca de sinal são subdivididas (quadtree) perto
+  do conjunto zero e contornadas com marching squares.
+- Curvas paramétricas `(x(t), y(t))`: avaliadas sobre um array de t.
+
+Usado pela interface Tk (`view.py`) e pelo endpoint web (`webapp.py`).
+"""
+
+import ast
+
+import numpy as np
+
+# nomes permitidos nas expressões, já na versão NumPy (vetorizada)
+VECTOR_ENV = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'exp': np.exp, 'log': np.log, 'log10': np.log10, 'sqrt': np.sqrt,
+    'floor': np.floor, 'ceil': np.ceil, 'trunc': np.trunc,
+    'fabs': np.abs, 'abs': np.abs, 'pow': np.power, 'hypot': np.hypot,
+    'degrees': np.degrees, 'radians': np.radians,
+    'min': np.minimum, 'max': np.maximum,
+    'pi': np.pi, 'e': np.e,
+}
+
+# nós de AST permitidos nas expressões (qualquer outro é rejeitado)
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Constant,
+    ast.Compare, ast.IfExp, ast.Tuple, ast.Load,
+    ast.operator, ast.unaryop, ast.cmpop,
+)
+
+# marching squares: cantos 0=(x0,y0) 1=(x1,y0) 2=(x1,y1) 3=(x0,y1),
+# arestas 0=baixo 1=direita 2=cima 3=esquerda; até dois segmentos por caso
+_SEGMENTS = np.array([
+    [[-1, -1], [-1, -1]],   # 0
+    [[3, 0], [-1, -1]],     # 1
+    [[0, 1], [-1, -1]],     # 2
+    [[3, 1], [-1, -1]],     # 3
+    [[1, 2], [-1, -1]],     # 4
+    [[3, 0], [1, 2]],       # 5 (sela, ver _SADDLE)
+    [[0, 2], [-1, -1]],     # 6
+    [[3, 2], [-1, -1]],     # 7
+    [[2, 3], [-1, -1]],     # 8
+    [[0, 2], [-1, -1]],     # 9
+    [[0, 1], [2, 3]],       # 10 (sela)
+    [[1, 2], [-1, -1]],     # 11
+    [[1, 3], [-1, -1]],     # 12
+    [[0, 1], [-1, -1]],     # 13
+    [[3, 0], [-1, -1]],     # 14
+    [[-1, -1], [-1, -1]],   # 15
+])
+# sela com centro > 0: o interior passa pelo centro, isolando os cantos de fora
+_SADDLE = {5: [[0, 1], [2, 3]], 10: [[3, 0], [1, 2]]}
+
+
+def _check_tree(tree, allowed):
+    """Percorre a AST inteira; levanta ValueError em qualquer construção proibida."""
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"construção não permitida: {type(node).__name__}")
+        if isinstance(node, ast.Name) and (node.id.startswith('__') or node.id not in allowed):
+            raise ValueError(f"nome não permitido: {node.id}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError("só constantes numéricas são permitidas")
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and callable(VECTOR_ENV.get(node.func.id))):
+                raise ValueError("só funções matemáticas podem ser chamadas")
+            if node.keywords:
+                raise ValueError("argumentos nomeados não são permitidos")
+
+
+def _float_constants(tree):
+    """Troca constantes inteiras por float.
+
+    Evita aritmética de inteiros grandes (ex.: `9**9**9`), que travaria a CPU:
+    com floats o overflow levanta erro imediatamente.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            try:
+                node.value = float(node.value)
+            except OverflowError:
+                raise ValueError("constante grande demais")
+
+
+def compile_expr(expr: str, variables):
+    """Compila `expr` aceitando só nomes de `VECTOR_ENV` e `variables`.
+
+    A AST é validada por completo: apenas operações aritméticas, comparações,
+    `a if c else b`, tuplas e chamadas de funções de `VECTOR_ENV`.
+
+    Aceita `^` como potência e, para curvas implícitas, `lhs = rhs`.
+    Levanta ValueError em expressões inválidas ou com nomes não permitidos.
+    """
+    if not expr or not expr.strip():
+        raise ValueError("expressão vazia")
+    src = expr.strip().replace('^', '**')
+    # "lhs = rhs" -> (lhs) - (rhs), sem mexer em ==, <=, >=, !=
+    parts = src.replace('==', '\0').replace('<=', '\1').replace('>=', '\2').replace('!=', '\3').split('=')
+    if len(parts) == 2:
+        restore = lambda s: s.replace('\0', '==').replace('\1', '<=').replace('\2', '>=').replace('\3', '!=')
+        src = f"({restore(parts[0])}) - ({restore(parts[1])})"
+    elif len(parts) > 2:
+        raise ValueError("mais de um '=' na expressão")
+    try:
+        tree = ast.parse(src, '<expr>', 'eval')
+    except SyntaxError as e:
+        raise ValueError(f"sintaxe inválida: {e.msg}")
+    _check_tree(tree, set(VECTOR_ENV) | set(variables))
+    _float_constants(tree)
+    return compile(tree, '<expr>', 'eval')
+
+
+def eval_vector(code, **arrays):
+    """Avalia `code` sobre arrays NumPy; resultado float com o shape dos arrays.
+
+    Erros de execução (ex.: `1/0` com constantes) viram ValueError.
+    """
+    shape = np.broadcast_shapes(*(np.shape(a) for a in arrays.values()))
+    try:
+        with np.errstate(all='ignore'):
+            out = eval(code, {'__builtins__': {}, **VECTOR_ENV}, arrays)
+            out = np.asarray(out, dtype=float)
+        return np.broadcast_to(out, shape)
+    except Exception as e:
+        raise ValueError(f"erro ao avaliar expressão: {e}")
+
+
+def parametric_points(xexpr: str, yexpr: str, tmin: float, tmax: float, samples: int = 1000):
+    """Pontos (xs, ys) da curva (x(t), y(t)) para t em [tmin, tmax]."""
+    xc = compile_expr(xexpr, ('t',))
+    yc = compile_expr(yexpr, ('t',))
+    ts = np.linspace(float(tmin), float(tmax), max(int(samples), 2))
+    xs = np.array(eval_vector(xc, t=ts))
+    ys = np.array(eval_vector(yc, t=ts))
+    bad = ~(np.isfinite(xs) & np.isfinite(ys))
+    xs[bad] = np.nan
+    ys[bad] = np.nan
+    return xs, ys
+
+
+def _crossing(v):
+    """Células (linhas de `v`, 4 cantos) finitas com troca de sinal."""
+    finite = np.isfinite(v).all(axis=1)
+    with np.errstate(invalid='ignore'):
+        return finite & (v.min(axis=1) <= 0) & (v.max(axis=1) >= 0)
+
+
+def implicit_segments(expr: str, xlim, ylim, resolution: int = 64, depth: int = 3):
+    """Segmentos da curva `F(x, y) = 0` dentro de `xlim` x `ylim`.
+
+    A grade inicial tem `resolution` células no maior eixo; células que cruzam
+    o zero são subdivididas `depth` vezes. Retorna array (n, 2, 2) com os
+    extremos ((x0, y0), (x1, y1)) de cada segmento.
+    """
+    code = compile_expr(expr, ('x', 'y'))
+    f = lambda x, y: eval_vector(code, x=x, y=y)
+    xmin, xmax = map(float, xlim)
+    ymin, ymax = map(float, ylim)
+    h = max(xmax - xmin, ymax - ymin) / max(int(resolution), 1)
+    nx = max(int(np.ceil((xmax - xmin) / h)), 1)
+    ny = max(int(np.ceil((ymax - ymin) / h)), 1)
+
+    # grade grossa: uma única avaliação
+    gx = xmin + h * np.arange(nx + 1)
+    gy = ymin + h * np.arange(ny + 1)
+    G = f(gx[None, :], gy[:, None])
+    x0 = np.repeat(gx[None, :-1], ny, axis=0).ravel()
+    y0 = np.repeat(gy[:-1, None], nx, axis=1).ravel()
+    v = np.column_stack([G[:-1, :-1].ravel(), G[:-1, 1:].ravel(),
+                         G[1:, 1:].ravel(), G[1:, :-1].ravel()])
+    keep = _crossing(v)
+    x0, y0, v = x0[keep], y0[keep], v[keep]
+
+    # refinamento quadtree só nas células que cruzam o zero
+    for _ in range(max(int(depth), 0)):
+        if len(v) == 0:
+            break
+        h2 = h / 2.0
+        # 5 pontos novos por célula: meios das arestas e centro
+        px = np.column_stack([x0 + h2, x0 + h, x0 + h2, x0, x0 + h2])
+        py = np.column_stack([y0, y0 + h2, y0 + h, y0 + h2, y0 + h2])
+        m = f(px, py)
+        mb, mr, mt, ml, mc = m[:, 0], m[:, 1], m[:, 2], m[:, 3], m[:, 4]
+        c0, c1, c2, c3 = v[:, 0], v[:, 1], v[:, 2], v[:, 3]
+        x0 = np.concatenate([x0, x0 + h2, x0 + h2, x0])
+        y0 = np.concatenate([y0, y0, y0 + h2, y0 + h2])
+        v = np.concatenate([
+            np.column_stack([c0, mb, mc, ml]),
+            np.column_stack([mb, c1, mr, mc]),
+            np.column_stack([mc, mr, c2, mt]),
+            np.column_stack([ml, mc, mt, c3]),
+        ])
+        h = h2
+        keep = _crossing(v)
+        x0, y0, v = x0[keep], y0[keep], v[keep]
+
+    return _march(x0, y0, h, v, f)
+
+
+def implicit_segments_fit(expr: str, xlim, ylim, resolution: int = 64, depth: int = 3, max_grow: int = 3):
+    """Como `implicit_segments`, mas amplia a área até a curva caber nela.
+
+    Enquanto algum segmento toca a borda, a área dobra em torno do centro
+    (no máximo `max_grow` vezes), mantendo o tamanho das células.
+    """
+    xmin, xmax = map(float, xlim)
+    ymin, ymax = map(float, ylim)
+    res = int(resolution)
+    for step in range(max(int(max_grow), 0) + 1):
+        segs = implicit_segments(expr, (xmin, xmax), (ymin, ymax), resolution=res, depth=depth)
+        tol = max(xmax - xmin, ymax - ymin) / res
+        touches = len(segs) and (
+            (segs[:, :, 0].min() <= xmin + tol) or (segs[:, :, 0].max() >= xmax - tol)
+            or (segs[:, :, 1].min() <= ymin + tol) or (segs[:, :, 1].max() >= ymax - tol))
+        if not touches or step == max_grow:
+            return segs
+        cx, cy = (xmin + xmax) / 2.0, (ymin + ymax) / 2.0
+        xmin, xmax = cx - (xmax - xmin), cx + (xmax - xmin)
+        ymin, ymax = cy - (ymax - ymin), cy + (ymax - ymin)
+        res *= 2
+    return segs
+
+
+def _march(x0, y0, h, v, f):
+    """Marching squares vetorizado sobre células de lado `h`."""
+    if len(v) == 0:
+        return np.empty((0, 2, 2))
+    inside = v > 0
+    case = (inside[:, 0] * 1 + inside[:, 1] * 2 + inside[:, 2] * 4 + inside[:, 3] * 8).astype(np.intp)
+    segs = _SEGMENTS[case].copy()
+    saddle = (case == 5) | (case == 10)
+    if saddle.any():
+        idx = np.flatnonzero(saddle)
+        center = f(x0[idx] + h / 2.0, y0[idx] + h / 2.0)
+        flip = center > 0
+        for k, c in zip(idx[flip], case[idx][flip]):
+            segs[k] = _SADDLE[int(c)]
+
+    # ponto de cruzamento em cada aresta (interpolação linear)
+    def lerp(a, b):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = a / (a - b)
+        return np.clip(np.nan_to_num(t, nan=0.5), 0.0, 1.0)
+
+    c0, c1, c2, c3 = v[:, 0], v[:, 1], v[:, 2], v[:, 3]
+    ex = np.column_stack([x0 + h * lerp(c0, c1), x0 + h, x0 + h * lerp(c3, c2), x0])
+    ey = np.column_stack([y0, y0 + h * lerp(c1, c2), y0 + h, y0 + h * lerp(c0, c3)])
+
+    cell, slot = np.nonzero(segs[:, :, 0] >= 0)
+    a = segs[cell, slot, 0]
+    b = segs[cell, slot, 1]
+    out = np.empty((len(cell), 2, 2))
+    out[:, 0, 0] = ex[cell, a]
+    out[:, 0, 1] = ey[cell, a]
+    out[:, 1, 0] = ex[cell, b]
+    out[:, 1, 1] = ey[cell, b]
+    return out
+
+
+def segments_to_polyline(segs):
+    """Achata (n, 2, 2) em listas xs, ys separadas por None (formato Plotly)."""
+    n = len(segs)
+    xs = np.full(n * 3, np.nan)
+    ys = np.full(n * 3, np.nan)
+    xs[0::3], xs[1::3] = segs[:, 0, 0], segs[:, 1, 0]
+    ys[0::3], ys[1::3] = segs[:, 0, 1], segs[:, 1, 1]
+    return nan_to_none(xs), nan_to_none(ys)
+
+
+def nan_to_none(a):
+    """Converte um array em lista JSON, trocando NaN/inf por None."""
+    return [None if not np.isfinite(v) else float(v) for v in a]
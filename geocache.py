@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Cache read-through na frente de `criar_geodb`.
+
+Guarda o resultado de `get_user_by_username` e da lista de cálculos de cada
+usuário. Escritas (`save_calculation`, `create_user`) invalidam só as chaves
+afetadas. A lista usa uma geração por usuário dentro da chave: cada escrita
+troca a geração, então uma leitura concorrente que consultou o banco antes do
+commit grava numa chave que ninguém mais lê.
+
+Backends:
+- padrão: LRU local ao processo com TTL;
+- compartilhado: Redis, se `GEOGEBRA_CACHE_URL` (ex.: redis://localhost:6379/0)
+  estiver definido e o pacote `redis` instalado. Necessário quando há vários
+  workers, para que a invalidação feita por um valha para todos.
+
+Config por variáveis de ambiente: GEOGEBRA_CACHE_URL, GEOGEBRA_CACHE_TTL
+(segundos, padrão 60) e GEOGEBRA_CACHE_SIZE (entradas do LRU, padrão 1024).
+"""
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import criar_geodb as geodb
+
+CACHE_CONFIG = {
+    'url': os.environ.get('GEOGEBRA_CACHE_URL'),
+    'ttl': float(os.environ.get('GEOGEBRA_CACHE_TTL', '60')),
+    'size': int(os.environ.get('GEOGEBRA_CACHE_SIZE', '1024')),
+}
+
+MISSING = object()
+
+# tamanho da lista de cálculos guardada por usuário
+LIST_LIMIT = 200
+
+
+class LRUCache:
+    """LRU com expiração por entrada, seguro entre threads."""
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is MISSING:
+                return MISSING
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key, value):
+        """Grava só se a chave não existir (ou tiver expirado)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] >= time.monotonic():
+                return False
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Backend compartilhado entre processos (valores serializados com pickle)."""
+
+    def __init__(self, client, ttl=60.0, prefix='geogebra:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            print(f"[geocache] erro no redis: {e}")
+            return MISSING
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)
+
+    def set(self, key, value):
+        try:
+            self.client.set(self.prefix + key, pickle.dumps(value), ex=max(int(self.ttl), 1))
+        except Exception as e:
+            print(f"[geocache] erro no redis: {e}")
+
+    def add(self, key, value):
+        try:
+            return bool(self.client.set(self.prefix + key, pickle.dumps(value), ex=max(int(self.ttl), 1), nx=True))
+        except Exception as e:
+            print(f"[geocache] erro no redis: {e}")
+            return False
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            print(f"[geocache] erro no redis: {e}")
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            print(f"[geocache] erro no redis: {e}")
+
+
+def make_cache(config=CACHE_CONFIG):
+    """Cria o backend conforme `config`; sem URL (ou sem redis) usa o LRU local."""
+    url = config.get('url')
+    if url:
+        try:
+            import redis
+            return RedisCache(redis.Redis.from_url(url), ttl=config['ttl'])
+        except Exception as e:
+            print(f"[geocache] redis indisponível, usando cache local: {e}")
+    return LRUCache(maxsize=config['size'], ttl=config['ttl'])
+
+
+cache = make_cache()
+
+
+def _user_key(username):
+    return f"user:{username}"
+
+
+def _calcs_gen_key(user_id):
+    return f"calcs-gen:{user_id}"
+
+
+def _calcs_key(user_id, gen):
+    return f"calcs:{user_id}:{gen}"
+
+
+def _calcs_generation(user_id):
+    """Geração atual da lista do usuário (cria uma se não houver)."""
+    key = _calcs_gen_key(user_id)
+    gen = cache.get(key)
+    if gen is MISSING:
+        # add (e não set) para não sobrescrever uma troca feita por uma escrita
+        cache.add(key, uuid.uuid4().hex)
+        gen = cache.get(key)
+    return gen
+
+
+def get_user_by_username(username: str):
+    """Igual a `geodb.get_user_by_username`, com cache."""
+    key = _user_key(username)
+    row = cache.get(key)
+    if row is MISSING:
+        row = geodb.get_user_by_username(username)
+        # None também significa falha de conexão: não guardar
+        if row is not None:
+            cache.set(key, row)
+    return row
+
+
+def list_user_calculations(user_id: int):
+    """Últimos `LIST_LIMIT` cálculos do usuário, em cache até o próximo save dele.
+
+    Retorna None se o banco falhar (nada é guardado nesse caso).
+    """
+    # a geração é lida antes da consulta: se uma escrita a trocar no meio,
+    # o resultado (talvez antigo) fica numa chave abandonada
+    gen = _calcs_generation(user_id)
+    rows = MISSING if gen is MISSING else cache.get(_calcs_key(user_id, gen))
+    if rows is MISSING:
+        rows = geodb.list_calculations_by_user(user_id, limit=LIST_LIMIT)
+        if rows is not None and gen is not MISSING:
+            cache.set(_calcs_key(user_id, gen), rows)
+    return rows
+
+
+def invalidate_user_calculations(user_id: int):
+    """Troca a geração da lista do usuário; deve ser chamada depois do commit."""
+    cache.set(_calcs_gen_key(user_id), uuid.uuid4().hex)
+
+
+def save_calculation(expr: str, result: str = None, image_bytes: bytes = None, user_id: int = None) -> bool:
+    ok = geodb.save_calculation(expr, result, image_bytes, user_id=user_id)
+    if ok:
+        invalidate_user_calculations(user_id)
+    return ok
+
+
+def create_user(username: str, password_hash: str) -> bool:
+    ok = geodb.create_user(username, password_hash)
+    if ok:
+        cache.delete(_user_key(username))
+    return ok
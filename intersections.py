@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""Motor de interseções entre retas (`Line`) e círculos (`Circle`).
+
+Calcula interseções reta-reta, reta-círculo e círculo-círculo em lote com
+NumPy. Um broadphase sort-and-sweep sobre as caixas delimitadoras (recortadas
+à área de trabalho) elimina pares que não podem se cruzar, e o narrowphase resolve
+todos os pares candidatos de cada tipo numa única passada vetorizada.
+
+Os resultados são expostos como `IntersectionPoint` (pontos derivados) e são
+atualizados incrementalmente quando um ponto se move: só os objetos que
+dependem do ponto são recalculados.
+"""
+
+import numpy as np
+
+from models import Line, Circle, IntersectionPoint
+
+KIND_LINE = 0
+KIND_CIRCLE = 1
+
+EPS = 1e-9
+
+
+def _line_boxes(params, bounds):
+    """Caixas (xmin, ymin, xmax, ymax) das retas recortadas a `bounds`.
+
+    Retas que não cruzam a área (ou degeneradas) recebem caixa vazia (NaN).
+    """
+    xmin, xmax, ymin, ymax = bounds
+    x1, y1, dx, dy = params[:, 0], params[:, 1], params[:, 2], params[:, 3]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # slab method: intervalo de t dentro de cada faixa
+        tx1 = (xmin - x1) / dx
+        tx2 = (xmax - x1) / dx
+        ty1 = (ymin - y1) / dy
+        ty2 = (ymax - y1) / dy
+    flat_x = np.abs(dx) < EPS
+    flat_y = np.abs(dy) < EPS
+    inside_x = (x1 >= xmin) & (x1 <= xmax)
+    inside_y = (y1 >= ymin) & (y1 <= ymax)
+    tx_lo = np.where(flat_x, np.where(inside_x, -np.inf, np.inf), np.minimum(tx1, tx2))
+    tx_hi = np.where(flat_x, np.where(inside_x, np.inf, -np.inf), np.maximum(tx1, tx2))
+    ty_lo = np.where(flat_y, np.where(inside_y, -np.inf, np.inf), np.minimum(ty1, ty2))
+    ty_hi = np.where(flat_y, np.where(inside_y, np.inf, -np.inf), np.maximum(ty1, ty2))
+    t_lo = np.maximum(tx_lo, ty_lo)
+    t_hi = np.minimum(tx_hi, ty_hi)
+    valid = (t_lo <= t_hi) & ~(flat_x & flat_y)
+    t_lo = np.where(valid, t_lo, 0.0)
+    t_hi = np.where(valid, t_hi, 0.0)
+    xa, xb = x1 + dx * t_lo, x1 + dx * t_hi
+    ya, yb = y1 + dy * t_lo, y1 + dy * t_hi
+    boxes = np.column_stack([np.minimum(xa, xb), np.minimum(ya, yb),
+                             np.maximum(xa, xb), np.maximum(ya, yb)])
+    boxes[~valid] = np.nan
+    return boxes
+
+
+def _circle_boxes(params, bounds):
+    """Caixas dos círculos recortadas a `bounds` (NaN se fora da área)."""
+    xmin, xmax, ymin, ymax = bounds
+    cx, cy, r = params[:, 0], params[:, 1], params[:, 2]
+    boxes = np.column_stack([np.maximum(cx - r, xmin), np.maximum(cy - r, ymin),
+                             np.minimum(cx + r, xmax), np.minimum(cy + r, ymax)])
+    empty = (boxes[:, 0] > boxes[:, 2]) | (boxes[:, 1] > boxes[:, 3]) | (r < EPS)
+    boxes[empty] = np.nan
+    return boxes
+
+
+def sweep_pairs(boxes):
+    """Broadphase sort-and-sweep: pares (i, j), i < j, com caixas sobrepostas.
+
+    Linhas de `boxes` com NaN são ignoradas. Retorna dois arrays de índices.
+    """
+    idx = np.flatnonzero(~np.isnan(boxes[:, 0]))
+    if idx.size < 2:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    order = np.argsort(boxes[idx, 0], kind='stable')
+    idx = idx[order]
+    b = boxes[idx]
+    n = len(b)
+    # ordenado por xmin: j > i sobrepõe em x sse xmin_j <= xmax_i
+    start = np.arange(1, n + 1)
+    end = np.searchsorted(b[:, 0], b[:, 2], side='right')
+    counts = np.maximum(end - start, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    ii = np.repeat(np.arange(n), counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    jj = np.arange(total) - offsets + np.repeat(start, counts)
+    keep = (b[ii, 1] <= b[jj, 3]) & (b[jj, 1] <= b[ii, 3])
+    a, c = idx[ii[keep]], idx[jj[keep]]
+    return np.minimum(a, c), np.maximum(a, c)
+
+
+def query_pairs(boxes, subset):
+    """Pares (i, j), i < j, entre os índices `subset` e todos os objetos."""
+    subset = np.asarray(subset, dtype=np.intp)
+    sb = boxes[subset]
+    live = ~np.isnan(sb[:, 0])
+    subset, sb = subset[live], sb[live]
+    if subset.size == 0 or len(boxes) < 2:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    with np.errstate(invalid='ignore'):
+        hit = ((sb[:, None, 0] <= boxes[None, :, 2]) & (boxes[None, :, 0] <= sb[:, None, 2])
+               & (sb[:, None, 1] <= boxes[None, :, 3]) & (boxes[None, :, 1] <= sb[:, None, 3]))
+    hit[np.arange(len(subset)), subset] = False
+    r, c = np.nonzero(hit)
+    a, b = subset[r], c
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    if lo.size == 0:
+        return lo, hi
+    uniq = np.unique(np.column_stack([lo, hi]), axis=0)
+    return uniq[:, 0], uniq[:, 1]
+
+
+def _line_line(P, i, j):
+    x1, y1, dx1, dy1 = P[i, 0], P[i, 1], P[i, 2], P[i, 3]
+    x2, y2, dx2, dy2 = P[j, 0], P[j, 1], P[j, 2], P[j, 3]
+    denom = dx1 * dy2 - dy1 * dx2
+    scale = np.hypot(dx1, dy1) * np.hypot(dx2, dy2)
+    ok = np.abs(denom) > EPS * scale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((x2 - x1) * dy2 - (y2 - y1) * dx2) / denom
+    xs = x1 + t * dx1
+    ys = y1 + t * dy1
+    return i[ok], j[ok], np.zeros(ok.sum(), dtype=np.intp), xs[ok], ys[ok]
+
+
+def _line_circle(P, i, j):
+    x1, y1, dx, dy = P[i, 0], P[i, 1], P[i, 2], P[i, 3]
+    cx, cy, r = P[j, 0], P[j, 1], P[j, 2]
+    fx, fy = x1 - cx, y1 - cy
+    a = dx * dx + dy * dy
+    b = 2.0 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - r * r
+    disc = b * b - 4.0 * a * c
+    ok = (disc >= -EPS * a) & (a > EPS)
+    root = np.sqrt(np.maximum(disc, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t0 = (-b - root) / (2.0 * a)
+        t1 = (-b + root) / (2.0 * a)
+    # tangente: um único ponto
+    two = ok & (root > EPS * np.sqrt(a) * np.maximum(r, 1.0))
+    ii = np.concatenate([i[ok], i[two]])
+    jj = np.concatenate([j[ok], j[two]])
+    slot = np.concatenate([np.zeros(ok.sum(), dtype=np.intp), np.ones(two.sum(), dtype=np.intp)])
+    t = np.concatenate([t0[ok], t1[two]])
+    return ii, jj, slot, P[ii, 0] + t * P[ii, 2], P[ii, 1] + t * P[ii, 3]
+
+
+def _circle_circle(P, i, j):
+    x1, y1, r1 = P[i, 0], P[i, 1], P[i, 2]
+    x2, y2, r2 = P[j, 0], P[j, 1], P[j, 2]
+    ex, ey = x2 - x1, y2 - y1
+    d = np.hypot(ex, ey)
+    ok = (d > EPS) & (d <= r1 + r2 + EPS) & (d >= np.abs(r1 - r2) - EPS)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (r1 * r1 - r2 * r2 + d * d) / (2.0 * d)
+        h = np.sqrt(np.maximum(r1 * r1 - a * a, 0.0))
+        ux, uy = ex / d, ey / d
+    mx, my = x1 + a * ux, y1 + a * uy
+    two = ok & (h > EPS)
+    ii = np.concatenate([i[ok], i[two]])
+    jj = np.concatenate([j[ok], j[two]])
+    slot = np.concatenate([np.zeros(ok.sum(), dtype=np.intp), np.ones(two.sum(), dtype=np.intp)])
+    xs = np.concatenate([mx[ok] - h[ok] * uy[ok], mx[two] + h[two] * uy[two]])
+    ys = np.concatenate([my[ok] + h[ok] * ux[ok], my[two] - h[two] * ux[two]])
+    return ii, jj, slot, xs, ys
+
+
+def narrowphase(kinds, params, i, j):
+    """Resolve em lote os pares candidatos (i, j).
+
+    Retorna arrays (i, j, slot, x, y), um elemento por ponto de interseção;
+    em pares mistos `i` é sempre a reta.
+    """
+    # pares mistos: reta primeiro
+    swap = (kinds[i] == KIND_CIRCLE) & (kinds[j] == KIND_LINE)
+    i, j = np.where(swap, j, i), np.where(swap, i, j)
+    ki, kj = kinds[i], kinds[j]
+    parts = []
+    m = (ki == KIND_LINE) & (kj == KIND_LINE)
+    if m.any():
+        parts.append(_line_line(params, i[m], j[m]))
+    m = (ki == KIND_LINE) & (kj == KIND_CIRCLE)
+    if m.any():
+        parts.append(_line_circle(params, i[m], j[m]))
+    m = (ki == KIND_CIRCLE) & (kj == KIND_CIRCLE)
+    if m.any():
+        parts.append(_circle_circle(params, i[m], j[m]))
+    if not parts:
+        e = np.empty(0, dtype=np.intp)
+        return e, e, e, np.empty(0), np.empty(0)
+    return tuple(np.concatenate(col) for col in zip(*parts))
+
+
+class IntersectionEngine:
+    """Mantém os pontos de interseção de uma cena de retas e círculos.
+
+    `extent` (xmin, xmax, ymin, ymax) é a área de trabalho: as caixas das retas
+    infinitas são recortadas a ela e só interseções dentro dela são reportadas.
+    Não é a área visível (o gráfico usa autoscale), por isso o padrão é amplo.
+    """
+
+    def __init__(self, extent=(-1000.0, 1000.0, -1000.0, 1000.0)):
+        self.extent = tuple(float(v) for v in extent)
+        self._objects = []          # Line/Circle, na ordem dos arrays
+        self._index = {}            # objeto -> índice
+        self._deps = {}             # id(Point) -> set de índices de objetos
+        self._kinds = np.empty(0, dtype=np.int8)
+        self._params = np.empty((0, 4))
+        self._boxes = np.empty((0, 4))
+        self._hits = {}             # (obj_a, obj_b) -> [IntersectionPoint]
+        self._by_obj = {}           # objeto -> set de chaves em _hits
+        self._counter = 0
+        self._points = None
+        self._coords = None
+
+    # ---- construção ----
+    def rebuild(self, lines, circles):
+        """Recalcula tudo para as listas de retas e círculos dadas.
+
+        Pontos derivados de pares que continuam se cruzando são reaproveitados
+        (mesmo objeto), para que referências externas continuem válidas. Quando
+        um par deixa de se cruzar, seu ponto é descartado; retas/círculos
+        construídos sobre ele mantêm as últimas coordenadas e não são mais
+        atualizados.
+        """
+        self._objects = list(lines) + list(circles)
+        self._index = {o: k for k, o in enumerate(self._objects)}
+        self._kinds = np.array([KIND_LINE] * len(lines) + [KIND_CIRCLE] * len(circles), dtype=np.int8)
+        self._params = np.zeros((len(self._objects), 4))
+        self._deps = {}
+        for k, o in enumerate(self._objects):
+            self._params[k] = self._object_params(o)
+            for p in self._object_points(o):
+                self._deps.setdefault(id(p), set()).add(k)
+        self._boxes = self._compute_boxes(np.arange(len(self._objects)))
+        i, j = sweep_pairs(self._boxes)
+        old = self._hits
+        self._hits = {}
+        self._by_obj = {}
+        moved = self._store(narrowphase(self._kinds, self._params, i, j), old)
+        self._propagate(moved)
+        self._invalidate()
+
+    def point_moved(self, point):
+        """Atualiza as interseções dos objetos que dependem de `point`.
+
+        Pontos derivados que se movem em consequência propagam a atualização
+        para objetos construídos sobre eles.
+        """
+        if self._propagate([point]):
+            self._invalidate()
+
+    # ---- consulta ----
+    @property
+    def points(self):
+        """Lista plana dos `IntersectionPoint` atuais."""
+        if self._points is None:
+            self._points = [p for pts in self._hits.values() for p in pts]
+        return self._points
+
+    def find_near(self, xdata, ydata, tol=0.3):
+        """Ponto derivado mais próximo de (xdata, ydata) dentro de `tol`."""
+        pts = self.points
+        if not pts:
+            return None
+        if self._coords is None:
+            self._coords = np.array([(p.x, p.y) for p in pts])
+        d = np.hypot(self._coords[:, 0] - xdata, self._coords[:, 1] - ydata)
+        k = int(np.argmin(d))
+        return pts[k] if d[k] < tol else None
+
+    # ---- internos ----
+    @staticmethod
+    def _object_points(o):
+        if isinstance(o, Line):
+            return (o.p1, o.p2)
+        return (o.center,)
+
+    @staticmethod
+    def _object_params(o):
+        if isinstance(o, Line):
+            return (o.p1.x, o.p1.y, o.p2.x - o.p1.x, o.p2.y - o.p1.y)
+        if isinstance(o, Circle):
+            return (o.center.x, o.center.y, o.radius, 0.0)
+        raise TypeError(f"objeto não suportado: {type(o).__name__}")
+
+    def _compute_boxes(self, idx):
+        boxes = np.full((len(idx), 4), np.nan)
+        kinds = self._kinds[idx]
+        params = self._params[idx]
+        m = kinds == KIND_LINE
+        if m.any():
+            boxes[m] = _line_boxes(params[m], self.extent)
+        m = kinds == KIND_CIRCLE
+        if m.any():
+            boxes[m] = _circle_boxes(params[m], self.extent)
+        return boxes
+
+    def _propagate(self, moved):
+        """Recalcula os objetos que dependem dos pontos `moved`, em cascata."""
+        pending = list(moved)
+        seen = set()
+        changed = False
+        while pending:
+            p = pending.pop()
+            if id(p) in seen:
+                continue
+            seen.add(id(p))
+            dirty = self._deps.get(id(p))
+            if not dirty:
+                continue
+            changed = True
+            pending.extend(self._update_objects(sorted(dirty)))
+        return changed
+
+    def _update_objects(self, idx):
+        """Recalcula os objetos `idx`; retorna os pontos derivados movidos.
+
+        Pares que deixaram de se cruzar perdem seus pontos derivados; objetos
+        construídos sobre esses pontos ficam com as coordenadas antigas.
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        for k in idx:
+            self._params[k] = self._object_params(self._objects[k])
+        self._boxes[idx] = self._compute_boxes(idx)
+        old = {}
+        for k in idx:
+            o = self._objects[k]
+            for key in self._by_obj.pop(o, ()):
+                if key in self._hits:
+                    old[key] = self._hits.pop(key)
+        for (a, b) in old:
+            self._by_obj.get(a, set()).discard((a, b))
+            self._by_obj.get(b, set()).discard((a, b))
+        i, j = query_pairs(self._boxes, idx)
+        return self._store(narrowphase(self._kinds, self._params, i, j), old)
+
+    def _store(self, result, old):
+        """Guarda o resultado do narrowphase, reaproveitando pontos de `old`."""
+        ri, rj, slot, xs, ys = result
+        xmin, xmax, ymin, ymax = self.extent
+        inside = (xs >= xmin - EPS) & (xs <= xmax + EPS) & (ys >= ymin - EPS) & (ys <= ymax + EPS)
+        moved = []
+        objs = self._objects
+        for a, b, s, x, y in zip(ri[inside].tolist(), rj[inside].tolist(), slot[inside].tolist(),
+                                 xs[inside].tolist(), ys[inside].tolist()):
+            oa, ob = objs[a], objs[b]
+            key = (oa, ob)
+            pts = self._hits.get(key)
+            if pts is None:
+                pts = self._hits[key] = []
+                self._by_obj.setdefault(oa, set()).add(key)
+                self._by_obj.setdefault(ob, set()).add(key)
+            prev = old.get(key)
+            if prev is not None and s < len(prev):
+                p = prev[s]
+                if p.x != x or p.y != y:
+                    p.x, p.y = x, y
+                    moved.append(p)
+            else:
+                self._counter += 1
+                p = IntersectionPoint(x, y, oa, ob, index=s, name=f"I{self._counter}")
+            pts.append(p)
+        return moved
+
+    def _invalidate(self):
+        self._points = None
+        self._coords = None
@@ -17,4 +17,24 @@ class Circle:
 
 class PlotFunc:
     def __init__(self, expr: str):
-        self.expr = expr  # string expression, evaluated with x in locals()
\ No newline at end of file
+        self.expr = expr  # string expression, evaluated with x in locals()
+
+class ImplicitCurve:
+    def __init__(self, expr: str):
+        self.expr = expr  # F(x, y) (or "lhs = rhs"); the curve is F = 0
+
+class ParametricCurve:
+    def __init__(self, xexpr: str, yexpr: str, tmin: float, tmax: float):
+        self.xexpr = xexpr  # x(t)
+        self.yexpr = yexpr  # y(t)
+        self.tmin = float(tmin)
+        self.tmax = float(tmax)
+
+class IntersectionPoint(Point):
+    # derived point: intersection `index` of two objects (Line/Circle),
+    # kept up to date by intersections.IntersectionEngine
+    def __init__(self, x, y, a, b, index=0, name=None):
+        super().__init__(x, y, name=name)
+        self.a = a
+        self.b = b
+        self.index = index
@@ -0,0 +1,53 @@
+"""Importação em lote: uma linha ruim não pode derrubar as vizinhas."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_import  # noqa: E402
+import criar_geodb as geodb  # noqa: E402
+
+
+class _DummyConn:
+    def close(self):
+        pass
+
+
+def _fake_db(monkeypatch):
+    inserted = []
+
+    def insert(conn, rows, page_size=1000):
+        start = len(inserted)
+        inserted.extend(rows)
+        return list(range(start, len(inserted)))
+
+    monkeypatch.setattr(geodb, 'get_pg_connection', lambda: _DummyConn())
+    monkeypatch.setattr(geodb, 'insert_calculations', insert)
+    return inserted
+
+
+def test_poison_lines_between_valid_lines(monkeypatch):
+    inserted = _fake_db(monkeypatch)
+    # valida no próprio processo: o comportamento de parse_item é o mesmo no pool
+    monkeypatch.setattr(bulk_import, '_validate_chunk',
+                        lambda lines: [bulk_import.parse_item(l) for l in lines])
+    lines = [
+        '{"expr": "sin(x)"}',
+        '{"expr": "x", "geometry": {"points": [{"x": 1' + '0' * 400 + ', "y": 0}]}}',
+        '{"expr": "x", "geometry": {"points": [{"x": 0, "y": 0}], '
+        '"circles": [{"center": 0, "radius": 1' + '0' * 400 + '}]}}',
+        '{"expr": "x", "result": ' + '[' * 100000 + ']' * 100000 + '}',
+        '{"expr": "cos(x)"}',
+    ]
+    out = list(bulk_import.import_ndjson(lines, user_id=1))
+
+    items, summary = out[:-1], out[-1]
+    assert [(i['line'], i['ok']) for i in items] == [
+        (2, False), (3, False), (4, False), (1, True), (5, True)]
+    assert summary == {'done': True, 'imported': 2, 'failed': 3}
+    assert [r[0] for r in inserted] == ['sin(x)', 'cos(x)']
+
+
+def test_parse_item_never_raises():
+    ok, err = bulk_import.parse_item('{"expr": "x", "result": ' + '[' * 100000 + ']' * 100000 + '}')
+    assert not ok and err
@@ -14,11 +14,14 @@ import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
 import io
 
 import arquivos_projetos.geogebra_2.criar_geodb as criar_geodb
 
-from models import Point, Line, Circle, PlotFunc
+from models import Point, Line, Circle, PlotFunc, ImplicitCurve, ParametricCurve
+from intersections import IntersectionEngine
+from curves import compile_expr, eval_vector, implicit_segments_fit, parametric_points
 
 # funções/math disponíveis para o ambiente seguro
 MATH_NAMES = [
@@ -55,6 +58,9 @@ class GeoCloneApp:
         self.objects_lines = []   # list of Line
         self.objects_circles = [] # list of Circle
         self.objects_plots = []   # list of PlotFunc
+        self.objects_implicit = []    # list of ImplicitCurve
+        self.implicit_cache = {}      # ImplicitCurve -> segments (n, 2, 2)
+        self.objects_parametric = []  # list of ParametricCurve
 
         # temp state
         self.selected_point = None
@@ -93,6 +99,8 @@ class GeoCloneApp:
         self.math_cb.bind('<<ComboboxSelected>>', self._on_math_select)
 
         ttk.Button(toolbar, text="Plot function", command=self.plot_function).pack(fill="x", pady=2)
+        ttk.Button(toolbar, text="Plot implicit", command=self.plot_implicit).pack(fill="x", pady=2)
+        ttk.Button(toolbar, text="Plot parametric", command=self.plot_parametric).pack(fill="x", pady=2)
         ttk.Button(toolbar, text="Save Plot", command=self.save_plot).pack(fill="x", pady=2)
 
         ttk.Separator(toolbar, orient="horizontal").pack(fill="x", pady=8)
@@ -106,6 +114,9 @@ class GeoCloneApp:
         self.ax.set_xlim(-10, 10)
         self.ax.set_ylim(-7, 7)
 
+        # interseções entre retas/círculos (pontos derivados)
+        self.intersections = IntersectionEngine()
+
         canvas = FigureCanvasTkAgg(self.fig, master=self.root)
         canvas_widget = canvas.get_tk_widget()
         canvas_widget.pack(side="right", fill="both", expand=True)
@@ -122,26 +133,36 @@ class GeoCloneApp:
         self.objects_lines.clear()
         self.objects_circles.clear()
         self.objects_plots.clear()
+        self.objects_implicit.clear()
+        self.implicit_cache.clear()
+        self.objects_parametric.clear()
         self.line_selection.clear()
         self.circle_center = None
         self.dragging_point = None
+        self.update_intersections()
         self.redraw()
 
+    def update_intersections(self):
+        """Recalcula todas as interseções (após criar/remover retas ou círculos)."""
+        self.intersections.rebuild(self.objects_lines, self.objects_circles)
+
     def list_objects(self):
         s = []
         for i,p in enumerate(self.objects_points,1):
             s.append(f"P{i}: ({p.x:.3f}, {p.y:.3f})")
         for i,l in enumerate(self.objects_lines,1):
-            try:
-                a_idx = self.objects_points.index(l.p1) + 1
-                b_idx = self.objects_points.index(l.p2) + 1
-            except ValueError:
-                a_idx = b_idx = '?'
-            s.append(f"L{i}: through P {a_idx} and P {b_idx}")
+            # endpoints may be intersection points (not in objects_points)
+            s.append(f"L{i}: through {l.p1.name or '?'} and {l.p2.name or '?'}")
         for i,c in enumerate(self.objects_circles,1):
             s.append(f"C{i}: center ({c.center.x:.3f},{c.center.y:.3f}), r={c.radius:.3f}")
+        for ip in self.intersections.points:
+            s.append(f"{ip.name}: ({ip.x:.3f}, {ip.y:.3f}) intersection")
         for i,f in enumerate(self.objects_plots,1):
             s.append(f"F{i}: {f.expr}")
+        for i,c in enumerate(self.objects_implicit,1):
+            s.append(f"IC{i}: {self._implicit_label(c)}")
+        for i,c in enumerate(self.objects_parametric,1):
+            s.append(f"PC{i}: ({c.xexpr}, {c.yexpr}), t in [{c.tmin:.3f}, {c.tmax:.3f}]")
         if not s:
             messagebox.showinfo("Objects", "Nenhum objeto presente.")
         else:
@@ -156,8 +177,11 @@ class GeoCloneApp:
         self.circle_center = None
         self.dragging_point = None
 
-    def find_point_near(self, xdata, ydata, tol=0.3):
-        """Procura um ponto existente perto do clique (em coordenadas do gráfico)."""
+    def find_point_near(self, xdata, ydata, tol=0.3, derived=False):
+        """Procura um ponto existente perto do clique (em coordenadas do gráfico).
+
+        Com `derived=True` também considera os pontos de interseção.
+        """
         best = None
         bestd = tol
         for p in self.objects_points:
@@ -165,6 +189,10 @@ class GeoCloneApp:
             if d < bestd:
                 best = p
                 bestd = d
+        if derived:
+            ip = self.intersections.find_near(xdata, ydata, tol=bestd)
+            if ip is not None:
+                best = ip
         return best
 
     def on_mouse_down(self, event):
@@ -190,7 +218,7 @@ class GeoCloneApp:
                 self.status.set("Move: clique num ponto para arrastar")
 
         elif t == "line":
-            p = self.find_point_near(x, y, tol=0.4)
+            p = self.find_point_near(x, y, tol=0.4, derived=True)
             if p is None:
                 # criar ponto automático se não existir
                 p = Point(x, y, name=f"P{len(self.objects_points)+1}")
@@ -203,13 +231,14 @@ class GeoCloneApp:
                     messagebox.showwarning("Line", "Selecione dois pontos diferentes.")
                 else:
                     self.objects_lines.append(Line(a, b))
+                    self.update_intersections()
                     self.status.set(f"Line created through {a.name} and {b.name}")
                 self.line_selection.clear()
                 self.redraw()
 
         elif t == "circle":
             # first click: center (if near point, choose it)
-            p = self.find_point_near(x, y, tol=0.4)
+            p = self.find_point_near(x, y, tol=0.4, derived=True)
             if p is None:
                 p = Point(x, y, name=f"P{len(self.objects_points)+1}")
                 self.objects_points.append(p)
@@ -230,6 +259,7 @@ class GeoCloneApp:
             # drop point
             p = self.dragging_point
             p.x, p.y = x, y
+            self.intersections.point_moved(p)
             self.status.set(f"Moved {p.name} to ({x:.2f}, {y:.2f})")
             self.dragging_point = None
             self.redraw()
@@ -241,6 +271,7 @@ class GeoCloneApp:
                 self.status.set("Circle radius muito pequeno, cancelado.")
             else:
                 self.objects_circles.append(Circle(self.circle_center, r))
+                self.update_intersections()
                 self.status.set(f"Circle created center {self.circle_center.name}, r={r:.3f}")
             self.circle_center = None
             self.circle_preview_radius = None
@@ -256,6 +287,7 @@ class GeoCloneApp:
             # live drag
             p = self.dragging_point
             p.x, p.y = x, y
+            self.intersections.point_moved(p)
             self.redraw(live=True)
 
         if t == "circle" and self.circle_center is not None:
@@ -272,6 +304,10 @@ class GeoCloneApp:
         # draw plots
         for pf in self.objects_plots:
             self._draw_plotfunc(pf)
+        for ic in self.objects_implicit:
+            self._draw_implicit(ic)
+        for pc in self.objects_parametric:
+            self._draw_parametric(pc)
         # draw lines (infinite visualized within limits)
         for l in self.objects_lines:
             self._draw_line(l)
@@ -288,6 +324,9 @@ class GeoCloneApp:
         for p in self.objects_points:
             self._draw_point(p)
 
+        # intersection points (derived)
+        self._draw_intersections()
+
         # draw axes
         self._draw_axes()
 
@@ -297,6 +336,18 @@ class GeoCloneApp:
         self.ax.plot(p.x, p.y, marker='o', markersize=6, color='#1f77b4')
         self.ax.text(p.x + 0.1, p.y + 0.1, p.name or "", fontsize=9)
 
+    def _draw_intersections(self):
+        pts = self.intersections.points
+        if not pts:
+            return
+        xs = [p.x for p in pts]
+        ys = [p.y for p in pts]
+        # single artist for all derived points
+        self.ax.plot(xs, ys, linestyle='none', marker='o', markersize=4, color='#444444')
+        if len(pts) <= 200:
+            for p in pts:
+                self.ax.text(p.x + 0.1, p.y - 0.3, p.name or "", fontsize=8, color='#444444')
+
     def _draw_line(self, l: Line):
         # compute two far points along the line to span axes limits
         x1, y1 = l.p1.x, l.p1.y
@@ -355,6 +406,37 @@ class GeoCloneApp:
                 ys[i] = np.nan
         self.ax.plot(xs, ys, linewidth=1.6, color='#000000')
 
+    @staticmethod
+    def _implicit_label(ic: ImplicitCurve):
+        # the expression may already be written as "lhs = rhs"
+        return ic.expr if '=' in ic.expr else f"{ic.expr} = 0"
+
+    def _sample_implicit(self, ic: ImplicitCurve):
+        """Amostra a curva a partir dos limites atuais, ampliando até ela caber.
+
+        O resultado não depende da vista (que é autoscale), então fica em cache.
+        """
+        segs = implicit_segments_fit(ic.expr, self.ax.get_xlim(), self.ax.get_ylim())
+        self.implicit_cache[ic] = segs
+        return segs
+
+    def _draw_implicit(self, ic: ImplicitCurve):
+        segs = self.implicit_cache.get(ic)
+        if segs is None:
+            try:
+                segs = self._sample_implicit(ic)
+            except Exception:
+                return
+        # one collection for all marching-squares segments
+        self.ax.add_collection(LineCollection(segs, linewidths=1.6, colors='#9467bd'))
+
+    def _draw_parametric(self, pc: ParametricCurve):
+        try:
+            xs, ys = parametric_points(pc.xexpr, pc.yexpr, pc.tmin, pc.tmax, samples=1000)
+        except Exception:
+            return
+        self.ax.plot(xs, ys, linewidth=1.6, color='#ff7f0e')
+
     def _draw_axes(self):
         self.ax.axhline(0, color='#444', linewidth=0.9)
         self.ax.axvline(0, color='#444', linewidth=0.9)
@@ -377,6 +459,49 @@ class GeoCloneApp:
         self.status.set(f"Function plotted: {expr}")
         self.redraw()
 
+    def plot_implicit(self):
+        """Plota a curva implícita F(x, y) = 0 com a expressão do campo de texto."""
+        expr = self.func_entry.get().strip()
+        if not expr:
+            messagebox.showwarning("Plot", "Insira uma expressão F(x, y), ex.: x**2 + y**2 - 9")
+            return
+        ic = ImplicitCurve(expr)
+        try:
+            # real evaluation; the segments are kept for drawing
+            self._sample_implicit(ic)
+        except Exception as e:
+            messagebox.showerror("Erro na expressão", f"Erro ao avaliar expressão:\n{e}")
+            return
+        self.objects_implicit.append(ic)
+        self.status.set(f"Implicit curve plotted: {self._implicit_label(ic)}")
+        self.redraw()
+
+    def plot_parametric(self):
+        """Pede x(t), y(t) e o intervalo de t e plota a curva paramétrica."""
+        xexpr = simpledialog.askstring("Parametric", "x(t):", initialvalue="cos(t)", parent=self.root)
+        if not xexpr:
+            return
+        yexpr = simpledialog.askstring("Parametric", "y(t):", initialvalue="sin(t)", parent=self.root)
+        if not yexpr:
+            return
+        trange = simpledialog.askstring("Parametric", "t min, t max:", initialvalue="0, 2*pi", parent=self.root)
+        if not trange:
+            return
+        try:
+            tmin_s, tmax_s = trange.split(',', 1)
+            tmin = float(eval_vector(compile_expr(tmin_s, ())))
+            tmax = float(eval_vector(compile_expr(tmax_s, ())))
+            if not (math.isfinite(tmin) and math.isfinite(tmax)):
+                raise ValueError("intervalo de t inválido")
+            # quick test evaluation with a few samples
+            parametric_points(xexpr, yexpr, tmin, tmax, samples=8)
+        except Exception as e:
+            messagebox.showerror("Erro na expressão", f"Erro ao avaliar expressão:\n{e}")
+            return
+        self.objects_parametric.append(ParametricCurve(xexpr, yexpr, tmin, tmax))
+        self.status.set(f"Parametric curve plotted: ({xexpr}, {yexpr})")
+        self.redraw()
+
     def save_plot(self):
         """Salva a(s) função(ões) atualmente plotadas e a imagem do gráfico no Postgres.
 
@@ -384,8 +509,11 @@ class GeoCloneApp:
         de texto (se preenchida) e a imagem atual.
         """
         # preparar expressão resumida
-        if self.objects_plots:
-            expr = "; ".join(p.expr for p in self.objects_plots)
+        exprs = [p.expr for p in self.objects_plots]
+        exprs += [self._implicit_label(c) for c in self.objects_implicit]
+        exprs += [f"({c.xexpr}, {c.yexpr})" for c in self.objects_parametric]
+        if exprs:
+            expr = "; ".join(exprs)
         else:
             expr = self.func_entry.get().strip() or None
         if not expr:
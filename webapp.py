@@ -1,11 +1,15 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response, stream_with_context
 import base64
 import io
 from pathlib import Path
 
 import criar_geodb as geodb
+import geocache
+import bulk_import
+import curves
 from flask import session
 from werkzeug.security import generate_password_hash, check_password_hash
+import hashlib
 import json
 import os
 
@@ -37,12 +41,63 @@ def save():
             return jsonify({'ok': False, 'error': 'invalid image data', 'detail': str(e)}), 400
 
     user_id = session.get('user_id')
-    ok = geodb.save_calculation(expr, None, img_bytes, user_id=user_id)
+    ok = geocache.save_calculation(expr, None, img_bytes, user_id=user_id)
     if ok:
         return jsonify({'ok': True})
     return jsonify({'ok': False, 'error': 'db save failed'}), 500
 
 
+@app.route('/api/import', methods=['POST'])
+def api_import():
+    """Importa cálculos em lote a partir de um corpo NDJSON (uma expressão por linha).
+
+    A resposta também é NDJSON: uma linha de progresso por item e um resumo final.
+    """
+    user_id = session.get('user_id')
+    if user_id is None:
+        return jsonify({'ok': False, 'error': 'login required'}), 401
+
+    def lines():
+        for raw in request.stream:
+            yield raw.decode('utf-8', errors='replace')
+
+    def generate():
+        try:
+            for progress in bulk_import.import_ndjson(lines(), user_id=user_id):
+                yield json.dumps(progress) + '\n'
+        finally:
+            geocache.invalidate_user_calculations(user_id)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/curve', methods=['POST'])
+def api_curve():
+    """Avalia uma curva implícita ou paramétrica e devolve x/y para o Plotly.
+
+    Valores `null` marcam quebras entre segmentos.
+    """
+    data = request.get_json() or {}
+    kind = data.get('kind')
+    try:
+        if kind == 'implicit':
+            xlim = (float(data.get('xmin', -10)), float(data.get('xmax', 10)))
+            ylim = (float(data.get('ymin', xlim[0])), float(data.get('ymax', xlim[1])))
+            resolution = min(int(data.get('resolution', 128)), 512)
+            segs = curves.implicit_segments(data.get('expr'), xlim, ylim, resolution=resolution)
+            xs, ys = curves.segments_to_polyline(segs)
+        elif kind == 'parametric':
+            samples = min(int(data.get('samples', 1000)), 100000)
+            px, py = curves.parametric_points(data.get('xexpr'), data.get('yexpr'),
+                                              float(data.get('tmin', 0)), float(data.get('tmax', 1)), samples)
+            xs, ys = curves.nan_to_none(px), curves.nan_to_none(py)
+        else:
+            return jsonify({'ok': False, 'error': 'kind must be implicit or parametric'}), 400
+    except Exception as e:
+        return jsonify({'ok': False, 'error': 'invalid expression', 'detail': str(e)}), 400
+    return jsonify({'ok': True, 'x': xs, 'y': ys})
+
+
 @app.route('/api/register', methods=['POST'])
 def api_register():
     data = request.get_json() or {}
@@ -51,7 +106,7 @@ def api_register():
     if not username or not password:
         return jsonify({'ok': False, 'error': 'username and password required'}), 400
     ph = generate_password_hash(password)
-    ok = geodb.create_user(username, ph)
+    ok = geocache.create_user(username, ph)
     if ok:
         return jsonify({'ok': True})
     return jsonify({'ok': False, 'error': 'create failed'}), 500
@@ -64,7 +119,7 @@ def api_login():
     password = data.get('password')
     if not username or not password:
         return jsonify({'ok': False, 'error': 'username and password required'}), 400
-    row = geodb.get_user_by_username(username)
+    row = geocache.get_user_by_username(username)
     if not row:
         return jsonify({'ok': False, 'error': 'invalid'}), 401
     user_id, usern, password_hash, created_at = row
@@ -93,14 +148,20 @@ def api_list():
     user_id = session.get('user_id')
     if user_id is None:
         return jsonify([])
-    rows = geodb.list_calculations(limit=200)
-    # filter by user_id
+    rows = geocache.list_user_calculations(user_id)
+    if rows is None:
+        return jsonify({'ok': False, 'error': 'db list failed'}), 503
     out = []
     for r in rows:
         # r: id, expr, result, created_at, octet_length, user_id
-        if len(r) >= 6 and r[5] == user_id:
-            out.append({'id': r[0], 'expr': r[1], 'result': r[2], 'created_at': str(r[3])})
-    return jsonify(out)
+        out.append({'id': r[0], 'expr': r[1], 'result': r[2], 'created_at': str(r[3])})
+    # ETag: lista inalterada -> 304 (o navegador revalida com If-None-Match)
+    etag = hashlib.sha1(json.dumps([user_id, out], sort_keys=True).encode('utf-8')).hexdigest()
+    resp = jsonify(out)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    resp.headers['Vary'] = 'Cookie'
+    return resp.make_conditional(request)
 
 
 def start():